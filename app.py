@@ -4,6 +4,7 @@ import plotly.express as px
 import pandas as pd
 import base64
 import io
+from functools import lru_cache
 from PIL import Image
 
 # Initialize the app
@@ -42,6 +43,17 @@ app.layout = html.Div([
 ])
 
 # --- LOGIC: Color Extraction & Theme Sync ---
+@lru_cache(maxsize=4)
+def extract_accent_rgb(image_contents):
+    # Decode each uploaded image once; the callback also fires on dataset uploads
+    content_type, content_string = image_contents.split(',')
+    decoded = base64.b64decode(content_string)
+    img = Image.open(io.BytesIO(decoded)).convert('RGB')
+
+    # Get dominant color (Average of 1x1 resize)
+    small_img = img.resize((1, 1), Image.Resampling.BILINEAR)
+    return small_img.getpixel((0, 0))
+
 @app.callback(
     [Output('bg-container', 'style'),
      Output('main-title', 'style'),
@@ -58,18 +70,13 @@ def update_app(image_contents, data_contents, img_name):
     
     if image_contents:
         # 1. Process Image and Extract Color
-        content_type, content_string = image_contents.split(',')
-        decoded = base64.b64decode(content_string)
-        img = Image.open(io.BytesIO(decoded)).convert('RGB')
-        
-        # Get dominant color (Average of 1x1 resize)
-        small_img = img.resize((1, 1), Image.Resampling.BILINEAR)
-        r, g, b = small_img.getpixel((0, 0))
+        r, g, b = extract_accent_rgb(image_contents)
         accent_color = f'rgb({r}, {g}, {b})'
         
         # 2. Determine Text Color (Black or White)
-        luminance = (0.2126*r + 0.7152*g + 0.0722*b) / 255
-        text_color = "black" if luminance > 0.5 else "white"
+        # Integer form of (0.2126*r + 0.7152*g + 0.0722*b) / 255 > 0.5
+        luminance = 2126*r + 7152*g + 722*b
+        text_color = "black" if luminance > 1275000 else "white"
         
         bg_style = {
             'backgroundImage': f'url({image_contents})',
@@ -1,11 +1,40 @@
+import numpy as np
 import plotly.express as px
 
+# A trend line keeps its shape with far fewer points than a large upload has.
+MAX_LINE_POINTS = 2000
+
+def _minmax_decimate(series, n_out):
+    # Keep the lowest and highest point of each bucket so peaks and dips survive,
+    # plus the first missing value of each bucket so line gaps still break.
+    if n_out < 2:
+        raise ValueError("n_out must be at least 2")
+    if len(series) <= n_out or series.dtype.kind not in "iuf":
+        return series
+
+    n_buckets = n_out // 2
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(values)
+    bounds = np.linspace(0, len(values), n_buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(bounds))
+
+    # Sorting by (bucket, value) puts each bucket's extreme first at its start.
+    starts = bounds[:-1]
+    lows = np.lexsort((np.where(missing, np.inf, values), bucket))[starts]
+    highs = np.lexsort((np.where(missing, np.inf, -values), bucket))[starts]
+    gaps = np.flatnonzero(missing)
+    gaps = gaps[np.unique(bucket[gaps], return_index=True)[1]]
+
+    keep = np.unique(np.concatenate([lows, highs, gaps]))
+    return series.iloc[keep]
+
 def generate_charts(df):
     charts = []
 
     numeric_cols = df.select_dtypes(include="number").columns
     if len(numeric_cols) > 0:
-        fig = px.line(df, y=numeric_cols[0], title="Trend Overview")
+        trend = _minmax_decimate(df[numeric_cols[0]], MAX_LINE_POINTS).to_frame()
+        fig = px.line(trend, y=numeric_cols[0], title="Trend Overview")
         charts.append(fig)
 
     if len(df.columns) >= 2:
@@ -1,15 +1,42 @@
 # report_ai.py
+import string
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
+VISUAL_NAMES = (
+    "numeric_distribution",
+    "numeric_scatter",
+    "category_volume",
+    "category_heatmap",
+    "radial_donut",
+)
+
+# Scatter plots stop gaining visual detail long before this many points.
+CHART_SAMPLE_ROWS = 50_000
+
+# Two-digit hex for every channel value, so formatting is three lookups.
+_HEX_BYTES = tuple(f"{i:02x}" for i in range(256))
+
 def _hex_to_rgb(hex_color: str):
     h = hex_color.lstrip("#")
     if len(h) == 3:
-        h = "".join([c * 2 for c in h])
-    return tuple(int(h[i:i + 2], 16) for i in (0, 2, 4))
+        h = h[0] * 2 + h[1] * 2 + h[2] * 2
+    elif len(h) == 8:
+        h = h[:6]  # drop the alpha channel of #rrggbbaa
+    # int() alone would also accept "_", "+", "-" and whitespace.
+    if len(h) != 6 or not all(c in string.hexdigits for c in h):
+        raise ValueError(f"Expected a #rgb or #rrggbb color, got {hex_color!r}")
+    v = int(h, 16)
+    return ((v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF)
 
 def _rgb_to_hex(rgb):
-    return "#{:02x}{:02x}{:02x}".format(*rgb)
+    r, g, b = rgb
+    if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+        raise ValueError(f"RGB channels must be within 0..255, got {tuple(rgb)!r}")
+    return "#" + _HEX_BYTES[r] + _HEX_BYTES[g] + _HEX_BYTES[b]
 
 def _blend(rgb_a, rgb_b, t: float):
     return (
@@ -18,10 +45,8 @@ def _blend(rgb_a, rgb_b, t: float):
         int(rgb_a[2] + (rgb_b[2] - rgb_a[2]) * t),
     )
 
-def generate_shades(base_hex: str, n: int):
-    """
-    Produce n shades of one base color by blending a light tint to a darker tone.
-    """
+@lru_cache(maxsize=64)
+def _shades_for(base_hex: str, n: int):
     base = _hex_to_rgb(base_hex)
     white = (255, 255, 255)
     black = (0, 0, 0)
@@ -30,14 +55,21 @@ def generate_shades(base_hex: str, n: int):
     dark_anchor = _blend(base, black, 0.35)
 
     if n <= 1:
-        return [_rgb_to_hex(base)]
+        return (_rgb_to_hex(base),)
 
-    shades = []
-    for i in range(n):
-        t = i / (n - 1)
-        rgb = _blend(light_anchor, dark_anchor, t)
-        shades.append(_rgb_to_hex(rgb))
-    return shades
+    # Same arithmetic as _blend, applied to every step at once.
+    light = np.array(light_anchor, dtype=float)
+    dark = np.array(dark_anchor, dtype=float)
+    t = (np.arange(n) / (n - 1))[:, None]
+    rgbs = (light + (dark - light) * t).astype(int)
+    return tuple(_rgb_to_hex(rgb) for rgb in rgbs.tolist())
+
+def generate_shades(base_hex: str, n: int):
+    """
+    Produce n shades of one base color by blending a light tint to a darker tone.
+    Palettes are memoized per (base_hex, n); callers get a fresh list each time.
+    """
+    return list(_shades_for(base_hex, n))
 
 def _polish_layout(fig, title_text: str):
     """
@@ -56,23 +88,85 @@ def _polish_layout(fig, title_text: str):
     )
     return fig
 
+def _as_labels(s: pd.Series):
+    """
+    Cast a column to string labels, skipping the cast when it is already string-typed.
+    """
+    if not isinstance(s.dtype, pd.StringDtype):
+        s = s.astype("string")
+    return s.fillna("Missing")
+
+def _category_counts(df: pd.DataFrame, col: str, counts_cache: dict):
+    """
+    Count a column's string labels once per build, memoized in counts_cache.
+    """
+    if col not in counts_cache:
+        counts_cache[col] = _as_labels(df[col]).value_counts()
+    return counts_cache[col]
+
+def _chart_sample(df: pd.DataFrame):
+    """
+    Cap the rows fed to point charts; counts and KPIs keep using the full frame.
+    """
+    if df.shape[0] <= CHART_SAMPLE_ROWS:
+        return df
+    return df.sample(CHART_SAMPLE_ROWS, random_state=0)
+
+def _split_columns(df: pd.DataFrame):
+    """
+    Split columns into numeric and categorical with one pass over the dtypes.
+    Mirrors select_dtypes(include="number"); bool columns count as categorical.
+    """
+    numeric_cols = []
+    categorical_cols = []
+    for col, dtype in df.dtypes.items():
+        if dtype.kind in "iufcm":
+            numeric_cols.append(col)
+        else:
+            categorical_cols.append(col)
+    return numeric_cols, categorical_cols
+
 def build_visuals(
     df: pd.DataFrame,
     report_type: str,
     user_choices: dict,
-    max_categories: int = 20
+    max_categories: int = 20,
+    numeric_cols: list = None,
+    categorical_cols: list = None,
+    only: set = None,
+    tables: bool = True
 ):
-    visuals = []
+    visuals = {}
+
+    # Restrict chart construction to the named visuals; the KPI summary is
+    # always returned, and tables=False skips the per-column summary tables.
+    if only is None:
+        only = set(VISUAL_NAMES)
+    unknown = set(only) - set(VISUAL_NAMES)
+    if unknown:
+        raise ValueError(
+            f"Unknown visual name(s) {sorted(unknown)}; expected any of {list(VISUAL_NAMES)}"
+        )
 
-    numeric_cols = df.select_dtypes(include="number").columns.tolist()
-    categorical_cols = df.select_dtypes(exclude="number").columns.tolist()
+    # Callers that build several reports from the same frame can pass the
+    # column split once instead of re-deriving it from the dtypes every call.
+    if numeric_cols is None or categorical_cols is None:
+        split_numeric, split_categorical = _split_columns(df)
+        if numeric_cols is None:
+            numeric_cols = split_numeric
+        if categorical_cols is None:
+            categorical_cols = split_categorical
+    # Accept any iterable of names, e.g. a pandas Index from select_dtypes.
+    numeric_cols = list(numeric_cols)
+    categorical_cols = list(categorical_cols)
+    counts_cache = {}
 
     # ---------- SUMMARY ----------
     summary = {
         "rows": int(df.shape[0]),
         "numeric_count": len(numeric_cols),
         "categorical_count": len(categorical_cols),
-        "missing_cells": int(df.isna().sum().sum()),
+        "missing_cells": int(np.count_nonzero(df.isna().to_numpy())),
         "primary_numeric_column": None,
         "mean": None,
         "median": None,
@@ -83,53 +177,48 @@ def build_visuals(
     # ---------- PRIMARY NUMERIC (KPIs + distribution) ----------
     primary_numeric = user_choices.get("primary_numeric")
     if primary_numeric and primary_numeric in numeric_cols:
-        s = df[primary_numeric]
+        stats = df[primary_numeric].agg(["mean", "median", "min", "max"])
+        summary["primary_numeric_column"] = primary_numeric
         summary.update(
             {
-                "primary_numeric_column": primary_numeric,
-                "mean": round(float(s.mean()), 2) if pd.notna(s.mean()) else None,
-                "median": round(float(s.median()), 2) if pd.notna(s.median()) else None,
-                "min": round(float(s.min()), 2) if pd.notna(s.min()) else None,
-                "max": round(float(s.max()), 2) if pd.notna(s.max()) else None,
+                stat: round(float(value), 2) if pd.notna(value) else None
+                for stat, value in stats.items()
             }
         )
 
-        fig = px.histogram(
-            df,
-            x=primary_numeric,
-            labels={primary_numeric: primary_numeric, "count": "Frequency"},
-        )
-        fig = _polish_layout(
-            fig,
-            f"Distribution of {primary_numeric}<br><sup>Frequency of values across the dataset</sup>"
-        )
-        visuals.append(("numeric_distribution", fig))
+        if "numeric_distribution" in only:
+            fig = px.histogram(
+                df,
+                x=primary_numeric,
+                labels={primary_numeric: primary_numeric, "count": "Frequency"},
+            )
+            fig = _polish_layout(
+                fig,
+                f"Distribution of {primary_numeric}<br><sup>Frequency of values across the dataset</sup>"
+            )
+            visuals["numeric_distribution"] = fig
 
     # ---------- NUMERIC COMPARISON (SCATTER) ----------
     x = user_choices.get("scatter_x")
     y = user_choices.get("scatter_y")
 
-    if x and y and x in numeric_cols and y in numeric_cols and x != y:
+    if (
+        "numeric_scatter" in only
+        and x and y and x in numeric_cols and y in numeric_cols and x != y
+    ):
         fig = px.scatter(
-            df,
+            _chart_sample(df[[x, y]]),
             x=x,
             y=y,
             labels={x: x, y: y},
         )
         fig = _polish_layout(fig, f"{y} vs. {x}")
-        visuals.append(("numeric_scatter", fig))
+        visuals["numeric_scatter"] = fig
 
     # ---------- CATEGORY VOLUME (BAR) ----------
     cat_vol = user_choices.get("category_volume")
-    if cat_vol and cat_vol in categorical_cols:
-        vc = (
-            df[cat_vol]
-            .astype("string")
-            .fillna("Missing")
-            .value_counts()
-            .head(max_categories)
-            .reset_index()
-        )
+    if "category_volume" in only and cat_vol and cat_vol in categorical_cols:
+        vc = _category_counts(df, cat_vol, counts_cache).head(max_categories).reset_index()
         vc.columns = [cat_vol, "Count"]
 
         fig = px.bar(
@@ -139,16 +228,19 @@ def build_visuals(
             labels={cat_vol: cat_vol, "Count": "Records"},
         )
         fig = _polish_layout(fig, f"Category Distribution: {cat_vol}")
-        visuals.append(("category_volume", fig))
+        visuals["category_volume"] = fig
 
     # ---------- CATEGORY COMPARISON (HEATMAP) ----------
     a = user_choices.get("category_a")
     b = user_choices.get("category_b")
 
-    if a and b and a in categorical_cols and b in categorical_cols and a != b:
+    if (
+        "category_heatmap" in only
+        and a and b and a in categorical_cols and b in categorical_cols and a != b
+    ):
         ct = pd.crosstab(
-            df[a].astype("string").fillna("Missing"),
-            df[b].astype("string").fillna("Missing"),
+            _as_labels(df[a]),
+            _as_labels(df[b]),
         )
 
         ct = ct.iloc[:max_categories, :max_categories]
@@ -158,7 +250,7 @@ def build_visuals(
             labels=dict(x=b, y=a, color="Count"),
         )
         fig = _polish_layout(fig, f"Category Relationship: {a} vs. {b}")
-        visuals.append(("category_heatmap", fig))
+        visuals["category_heatmap"] = fig
 
     # ---------- RADIAL CATEGORY (DONUT) ----------
     radial_col = user_choices.get("radial_category_col")
@@ -166,20 +258,25 @@ def build_visuals(
     radial_mode = user_choices.get("radial_mode")  # "count" or "sum"
     radial_value_col = user_choices.get("radial_value_col")  # numeric col if sum
 
-    if radial_col and radial_col in categorical_cols:
-        temp = df.copy()
-        temp[radial_col] = temp[radial_col].astype("string").fillna("Missing")
+    if "radial_donut" in only and radial_col and radial_col in categorical_cols:
+        if radial_mode == "sum" and radial_value_col and radial_value_col in numeric_cols:
+            labels = _as_labels(df[radial_col])
+            values = df[radial_value_col]
 
-        if radial_categories:
-            temp = temp[temp[radial_col].isin(radial_categories)]
+            if radial_categories:
+                keep = labels.isin(radial_categories)
+                labels = labels[keep]
+                values = values[keep]
 
-        if radial_mode == "sum" and radial_value_col and radial_value_col in numeric_cols:
-            grouped = temp.groupby(radial_col, dropna=False)[radial_value_col].sum().reset_index()
+            grouped = values.groupby(labels, dropna=False).sum().reset_index()
             grouped = grouped.rename(columns={radial_value_col: "Value"})
             value_label = f"Total {radial_value_col}"
             title = f"Category Breakdown by Total {radial_value_col}"
         else:
-            grouped = temp[radial_col].value_counts().reset_index()
+            vc = _category_counts(df, radial_col, counts_cache)
+            if radial_categories:
+                vc = vc[vc.index.isin(radial_categories)]
+            grouped = vc.reset_index()
             grouped.columns = [radial_col, "Value"]
             value_label = "Count"
             title = f"Category Breakdown: {radial_col}"
@@ -205,14 +302,17 @@ def build_visuals(
         )
 
         fig = _polish_layout(fig, title)
-        visuals.append(("radial_donut", fig))
+        visuals["radial_donut"] = fig
 
     # ---------- TABLES ----------
-    numeric_df = df[numeric_cols].describe().round(2).T if numeric_cols else pd.DataFrame()
+    if not tables:
+        return summary, visuals, pd.DataFrame(), pd.DataFrame()
+
+    numeric_df = df[numeric_cols].describe().round(2).T if len(numeric_cols) else pd.DataFrame()
 
     categorical_rows = []
     for col in categorical_cols:
-        vc = df[col].astype("string").fillna("Missing").value_counts()
+        vc = _category_counts(df, col, counts_cache)
         categorical_rows.append(
             {
                 "column": col,